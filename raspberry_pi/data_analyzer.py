@@ -13,41 +13,129 @@ import argparse
 import json
 from pathlib import Path
 from datetime import datetime
+from functools import cached_property
+from concurrent.futures import ProcessPoolExecutor
+
+# Dtypes matching the firmware's PacketEvent fields (firmware/*/logging.h):
+# addresses, node ids and sizes are uint16_t, hop counts uint8_t. read_csv
+# wraps out-of-range values silently, so none of these may be narrower.
+# Declaring them skips type inference and shrinks every column scan
+CSV_DTYPES = {
+    'timestamp': 'int64',
+    'node_id': 'uint16',
+    'src': 'uint16',
+    'dest': 'uint16',
+    'rssi': 'float32',
+    'snr': 'float32',
+    'etx': 'float32',
+    'hop_count': 'uint8',
+    'packet_size': 'uint16',
+    'sequence': 'int32',
+    'cost': 'float32',
+    'next_hop': 'uint16',
+    'gateway': 'uint16',
+}
 
 class DataAnalyzer:
+    # Filtered views cached on first use; cleared whenever data is reloaded
+    _CACHED_VIEWS = ('tx_sensor', 'rx_gateway', 'valid_rssi', 'valid_snr')
+
     def __init__(self, csv_file):
         self.csv_file = csv_file
         self.df = None
         self.results = {}
+        self._codes = None
+        self._code = {}
 
     def load_data(self):
         """Load CSV data into DataFrame"""
         try:
-            self.df = pd.read_csv(self.csv_file)
+            # Parsed frames are kept in a sibling Parquet file so re-runs skip the CSV
+            cache_file = Path(self.csv_file).with_suffix('.parquet')
+            self.df = self._read_parquet_cache(cache_file)
+
+            if self.df is None:
+                self.df = pd.read_csv(self.csv_file, dtype=CSV_DTYPES)
+
+                # Convert timestamp to datetime if needed
+                if 'timestamp' in self.df.columns:
+                    self.df['datetime'] = pd.to_datetime(self.df['timestamp'], unit='ms')
+
+                try:
+                    self.df.to_parquet(cache_file)
+                except (ImportError, OSError):
+                    # No Parquet engine or read-only directory; parse the CSV next time
+                    pass
+
+            for view in self._CACHED_VIEWS:
+                self.__dict__.pop(view, None)
             print(f"Loaded {len(self.df)} records from {self.csv_file}")
 
-            # Convert timestamp to datetime if needed
-            if 'timestamp' in self.df.columns:
-                self.df['datetime'] = pd.to_datetime(self.df['timestamp'], unit='ms')
+            # Categorical event types turn every filter into an int compare;
+            # masks test the raw codes directly (see _event_mask)
+            self.df['event_type'] = self.df['event_type'].astype('category')
+            self._codes = self.df['event_type'].cat.codes.to_numpy()
+            self._code = {
+                event: code for code, event in enumerate(self.df['event_type'].cat.categories)
+            }
 
             return True
         except Exception as e:
             print(f"Error loading data: {e}")
             return False
 
+    def _read_parquet_cache(self, cache_file):
+        """Return the cached frame if it is newer than the CSV, else None"""
+        if not cache_file.exists():
+            return None
+        if cache_file.stat().st_mtime < Path(self.csv_file).stat().st_mtime:
+            return None
+        try:
+            return pd.read_parquet(cache_file)
+        except ImportError:
+            return None
+
+    def _event_mask(self, *event_types):
+        """Boolean row mask for the given event types, from the category codes"""
+        codes = [self._code[event] for event in event_types if event in self._code]
+        if len(codes) == 1:
+            return self._codes == codes[0]
+        return np.isin(self._codes, codes)
+
+    def _events(self, event_type):
+        """Rows of a single event type"""
+        return self.df[self._event_mask(event_type)]
+
+    @cached_property
+    def tx_sensor(self):
+        """TX events from sensor nodes (1-2)"""
+        return self.df[self._event_mask('TX') & self.df['node_id'].isin([1, 2]).to_numpy()]
+
+    @cached_property
+    def rx_gateway(self):
+        """RX events at the gateway (node 5)"""
+        return self.df[self._event_mask('RX') & (self.df['node_id'] == 5).to_numpy()]
+
+    @cached_property
+    def valid_rssi(self):
+        """RSSI samples within the radio's reportable range"""
+        rssi = self.df['rssi']
+        # Widen the float32 column so the statistics stay float64
+        return rssi[(rssi != 0) & (rssi > -120) & (rssi < 0)].astype('float64')
+
+    @cached_property
+    def valid_snr(self):
+        """SNR samples within the radio's reportable range"""
+        snr = self.df['snr']
+        return snr[(snr != 0) & (snr > -20) & (snr < 30)].astype('float64')
+
     def calculate_pdr(self):
         """Calculate Packet Delivery Ratio"""
         # Count transmitted packets from sensor nodes (1-2)
-        tx_packets = self.df[
-            (self.df['event_type'] == 'TX') &
-            (self.df['node_id'].isin([1, 2]))
-        ]
+        tx_packets = self.tx_sensor
 
         # Count received packets at gateway (node 5)
-        rx_packets = self.df[
-            (self.df['event_type'] == 'RX') &
-            (self.df['node_id'] == 5)
-        ]
+        rx_packets = self.rx_gateway
 
         # Group by sequence number to avoid counting duplicates
         unique_tx = tx_packets['sequence'].nunique() if 'sequence' in tx_packets.columns else len(tx_packets)
@@ -69,46 +157,41 @@ class DataAnalyzer:
         """Calculate end-to-end latency"""
         latencies = []
 
-        # For each sequence number, find TX and RX times
+        # For each sequence number, pair first TX time with first RX time
         if 'sequence' in self.df.columns:
-            sequences = self.df['sequence'].unique()
-
-            for seq in sequences:
-                # Find transmission time
-                tx_events = self.df[
-                    (self.df['event_type'] == 'TX') &
-                    (self.df['sequence'] == seq)
-                ]
-
-                # Find reception time at gateway
-                rx_events = self.df[
-                    (self.df['event_type'] == 'RX') &
-                    (self.df['node_id'] == 5) &
-                    (self.df['sequence'] == seq)
-                ]
-
-                if not tx_events.empty and not rx_events.empty:
-                    tx_time = tx_events.iloc[0]['timestamp']
-                    rx_time = rx_events.iloc[0]['timestamp']
-                    latency = rx_time - tx_time
-                    if latency > 0:  # Sanity check
-                        latencies.append(latency)
+            # Transmissions anywhere, receptions at the gateway, in one groupby
+            is_tx = self._event_mask('TX')
+            is_rx = self._event_mask('RX') & (self.df['node_id'] == 5).to_numpy()
+            first_seen = (self.df[is_tx | is_rx]
+                          .groupby(['sequence', 'event_type'], observed=True, sort=False)['timestamp']
+                          .first()
+                          .unstack())
+
+            if 'TX' in first_seen.columns and 'RX' in first_seen.columns:
+                seq_latency = (first_seen['RX'] - first_seen['TX']).dropna()
+                latencies = seq_latency[seq_latency > 0].tolist()  # Sanity check
 
         if latencies:
+            arr = np.asarray(latencies, dtype=np.float64)
+            # One sort for all order statistics
+            lat_min, lat_median, lat_p95, lat_p99, lat_max = np.quantile(
+                arr, [0.0, 0.5, 0.95, 0.99, 1.0])
+            lat_mean = arr.mean()
+
             self.results['latency'] = {
-                'mean': np.mean(latencies),
-                'median': np.median(latencies),
-                'std': np.std(latencies),
-                'min': np.min(latencies),
-                'max': np.max(latencies),
-                'p95': np.percentile(latencies, 95),
-                'p99': np.percentile(latencies, 99),
-                'samples': len(latencies)
+                'mean': lat_mean,
+                'median': lat_median,
+                'std': arr.std(),
+                'min': lat_min,
+                'max': lat_max,
+                'p95': lat_p95,
+                'p99': lat_p99,
+                'samples': len(arr)
             }
 
-            print(f"Latency: Mean={np.mean(latencies):.2f}ms, "
-                  f"Median={np.median(latencies):.2f}ms, "
-                  f"P95={np.percentile(latencies, 95):.2f}ms")
+            print(f"Latency: Mean={lat_mean:.2f}ms, "
+                  f"Median={lat_median:.2f}ms, "
+                  f"P95={lat_p95:.2f}ms")
         else:
             print("No valid latency measurements found")
 
@@ -116,114 +199,114 @@ class DataAnalyzer:
 
     def calculate_overhead(self):
         """Calculate control overhead"""
+        # One hash count over event types covers every packet class
+        counts = self.df['event_type'].value_counts()
+
         # Count control packets (HELLO, ACK)
-        control_packets = self.df[
-            self.df['event_type'].isin(['HELLO', 'ACK', 'ROUTE'])
-        ]
+        control_by_type = counts.reindex(['HELLO', 'ACK', 'ROUTE'], fill_value=0)
+        control_packets = int(control_by_type.sum())
 
         # Count data packets
-        data_packets = self.df[
-            self.df['event_type'].isin(['TX', 'RX', 'FWD'])
-        ]
+        data_packets = int(counts.reindex(['TX', 'RX', 'FWD'], fill_value=0).sum())
 
-        total_packets = len(control_packets) + len(data_packets)
-        overhead_ratio = (len(control_packets) / total_packets * 100) if total_packets > 0 else 0
+        total_packets = control_packets + data_packets
+        overhead_ratio = (control_packets / total_packets * 100) if total_packets > 0 else 0
 
         self.results['overhead'] = {
             'ratio': overhead_ratio,
-            'control_packets': len(control_packets),
-            'data_packets': len(data_packets),
+            'control_packets': control_packets,
+            'data_packets': data_packets,
             'total_packets': total_packets
         }
 
         # Calculate by type
-        overhead_by_type = control_packets['event_type'].value_counts().to_dict()
+        control_by_type = control_by_type[control_by_type > 0].sort_values(
+            ascending=False, kind='stable')
+        overhead_by_type = {t: int(n) for t, n in control_by_type.items()}
         self.results['overhead']['by_type'] = overhead_by_type
 
-        print(f"Overhead: {overhead_ratio:.2f}% ({len(control_packets)}/{total_packets} packets)")
+        print(f"Overhead: {overhead_ratio:.2f}% ({control_packets}/{total_packets} packets)")
         return overhead_ratio
 
     def analyze_link_quality(self):
         """Analyze RSSI and SNR statistics"""
         # Filter valid RSSI/SNR values
-        valid_rssi = self.df[
-            (self.df['rssi'] != 0) &
-            (self.df['rssi'] > -120) &
-            (self.df['rssi'] < 0)
-        ]['rssi']
-
-        valid_snr = self.df[
-            (self.df['snr'] != 0) &
-            (self.df['snr'] > -20) &
-            (self.df['snr'] < 30)
-        ]['snr']
+        valid_rssi = self.valid_rssi
+        valid_snr = self.valid_snr
 
+        rssi_stats = self._summary_stats(valid_rssi)
+        snr_stats = self._summary_stats(valid_snr)
         self.results['link_quality'] = {
-            'rssi': {
-                'mean': valid_rssi.mean() if not valid_rssi.empty else 0,
-                'std': valid_rssi.std() if not valid_rssi.empty else 0,
-                'min': valid_rssi.min() if not valid_rssi.empty else 0,
-                'max': valid_rssi.max() if not valid_rssi.empty else 0
-            },
-            'snr': {
-                'mean': valid_snr.mean() if not valid_snr.empty else 0,
-                'std': valid_snr.std() if not valid_snr.empty else 0,
-                'min': valid_snr.min() if not valid_snr.empty else 0,
-                'max': valid_snr.max() if not valid_snr.empty else 0
-            }
+            'rssi': rssi_stats,
+            'snr': snr_stats
         }
 
-        print(f"RSSI: Mean={valid_rssi.mean():.1f}dBm, Std={valid_rssi.std():.1f}")
-        print(f"SNR: Mean={valid_snr.mean():.1f}dB, Std={valid_snr.std():.1f}")
+        print(f"RSSI: Mean={rssi_stats['mean']:.1f}dBm, Std={rssi_stats['std']:.1f}")
+        print(f"SNR: Mean={snr_stats['mean']:.1f}dB, Std={snr_stats['std']:.1f}")
+
+    @staticmethod
+    def _summary_stats(values):
+        """Mean/std/min/max reduced straight on the underlying array"""
+        arr = values.to_numpy()
+        if not arr.size:
+            return {'mean': 0, 'std': 0, 'min': 0, 'max': 0}
+
+        # ddof=1 matches the pandas sample standard deviation
+        return {
+            'mean': arr.mean(),
+            'std': arr.std(ddof=1) if arr.size > 1 else np.nan,
+            'min': arr.min(),
+            'max': arr.max()
+        }
 
     def analyze_routing(self):
         """Analyze routing behavior"""
         # Count route updates
-        route_updates = self.df[self.df['event_type'] == 'ROUTE']
+        route_updates = self._events('ROUTE')
 
         # Analyze hop counts
-        hop_counts = self.df[self.df['hop_count'] > 0]['hop_count']
+        hop_counts = self.df['hop_count'].to_numpy()
+        hop_counts = hop_counts[hop_counts > 0]
 
         # Analyze route costs
-        route_costs = self.df[self.df['cost'] > 0]['cost']
+        route_costs = self.df['cost'].to_numpy(dtype=np.float64)
+        route_costs = route_costs[route_costs > 0]
+
+        avg_hops = hop_counts.mean() if hop_counts.size else 0
 
         self.results['routing'] = {
             'route_updates': len(route_updates),
-            'avg_hop_count': hop_counts.mean() if not hop_counts.empty else 0,
-            'max_hop_count': hop_counts.max() if not hop_counts.empty else 0,
-            'avg_cost': route_costs.mean() if not route_costs.empty else 0,
+            'avg_hop_count': avg_hops,
+            'max_hop_count': hop_counts.max() if hop_counts.size else 0,
+            'avg_cost': route_costs.mean() if route_costs.size else 0,
             'route_changes': 0  # TODO: Calculate route changes
         }
 
         print(f"Routing: {len(route_updates)} updates, "
-              f"Avg hops={hop_counts.mean():.1f} if not hop_counts.empty else 0")
+              f"Avg hops={avg_hops:.1f}")
 
     def analyze_duty_cycle(self):
         """Analyze duty cycle usage"""
         # This would require airtime information
         # For now, estimate based on packet counts and sizes
 
-        nodes = self.df['node_id'].unique()
-        duty_cycles = {}
-
-        for node in nodes:
-            node_packets = self.df[
-                (self.df['node_id'] == node) &
-                (self.df['event_type'].isin(['TX', 'FWD']))
-            ]
+        # Transmissions per node in one grouped count
+        tx_mask = self._event_mask('TX', 'FWD')
+        tx_per_node = self.df.loc[tx_mask].groupby('node_id', sort=False).size()
 
-            if not node_packets.empty:
-                # Estimate airtime (rough calculation)
-                # SF7, BW125: ~50ms for 20-byte packet
-                avg_packet_size = node_packets['packet_size'].mean() if 'packet_size' in node_packets.columns else 20
-                airtime_per_packet = 50  # ms
-                total_airtime = len(node_packets) * airtime_per_packet
+        # Estimate airtime (rough calculation)
+        # SF7, BW125: ~50ms for 20-byte packet
+        airtime_per_packet = 50  # ms
+        total_airtime = tx_per_node.to_numpy() * airtime_per_packet
 
-                # Calculate percentage over experiment duration
-                experiment_duration = (self.df['timestamp'].max() - self.df['timestamp'].min())
-                duty_cycle = (total_airtime / experiment_duration * 100) if experiment_duration > 0 else 0
+        # Calculate percentage over experiment duration
+        experiment_duration = (self.df['timestamp'].max() - self.df['timestamp'].min())
+        if experiment_duration > 0:
+            duty = total_airtime / experiment_duration * 100
+        else:
+            duty = np.zeros(len(total_airtime))
 
-                duty_cycles[int(node)] = duty_cycle
+        duty_cycles = dict(zip(tx_per_node.index.astype(int).tolist(), duty.tolist()))
 
         self.results['duty_cycle'] = duty_cycles
         print(f"Duty cycles: {duty_cycles}")
@@ -233,7 +316,9 @@ class DataAnalyzer:
         fig, axes = plt.subplots(3, 1, figsize=(12, 8))
 
         # Plot 1: Packet events over time
-        events = self.df.groupby(['timestamp', 'event_type']).size().unstack(fill_value=0)
+        # Per-second bins (kept in ms to share the x axis with the panels below)
+        time_bin = (self.df['timestamp'] // 1000 * 1000).rename('timestamp')
+        events = pd.crosstab(time_bin, self.df['event_type'])
         events.plot(ax=axes[0], kind='area', stacked=True)
         axes[0].set_title('Packet Events Over Time')
         axes[0].set_xlabel('Time (ms)')
@@ -248,19 +333,31 @@ class DataAnalyzer:
             axes[1].set_ylabel('RSSI (dBm)')
 
         # Plot 3: PDR over time (sliding window)
-        window_size = 100  # packets
-        pdr_timeline = []
-        timestamps = []
-
-        for i in range(window_size, len(self.df), 10):
-            window = self.df.iloc[i-window_size:i]
-            tx = len(window[(window['event_type'] == 'TX') & (window['node_id'].isin([1, 2]))])
-            rx = len(window[(window['event_type'] == 'RX') & (window['node_id'] == 5)])
-            pdr = (rx / tx * 100) if tx > 0 else 0
-            pdr_timeline.append(pdr)
-            timestamps.append(window['timestamp'].mean())
-
-        if pdr_timeline:
+        window_ms = 10_000
+        stride_ms = 1_000
+
+        # Time-ordered event stream; windows span wall time, not row counts
+        ts = self.df['timestamp'].to_numpy()
+        order = np.argsort(ts, kind='stable')
+        ts = ts[order]
+        is_tx = (self._event_mask('TX') & self.df['node_id'].isin([1, 2]).to_numpy())[order]
+        is_rx = (self._event_mask('RX') & (self.df['node_id'] == 5).to_numpy())[order]
+
+        # Prefix sums make each window count a difference of two entries
+        tx_cum = np.concatenate([[0], np.cumsum(is_tx)])
+        rx_cum = np.concatenate([[0], np.cumsum(is_rx)])
+
+        if len(ts):
+            timestamps = np.arange(ts[0] + window_ms, ts[-1] + stride_ms, stride_ms)
+        else:
+            timestamps = np.empty(0, dtype=ts.dtype)
+        lo = np.searchsorted(ts, timestamps - window_ms, side='left')
+        hi = np.searchsorted(ts, timestamps, side='right')
+        tx = tx_cum[hi] - tx_cum[lo]
+        rx = rx_cum[hi] - rx_cum[lo]
+        pdr_timeline = np.where(tx > 0, rx / np.maximum(tx, 1) * 100, 0)
+
+        if len(pdr_timeline):
             axes[2].plot(timestamps, pdr_timeline)
             axes[2].set_title('PDR Over Time (Sliding Window)')
             axes[2].set_xlabel('Time (ms)')
@@ -270,7 +367,9 @@ class DataAnalyzer:
 
         if output_dir:
             plt.savefig(Path(output_dir) / 'timeline.png', dpi=300)
-        plt.show()
+            plt.close(fig)
+        else:
+            plt.show()
 
     def plot_distributions(self, output_dir=None):
         """Plot statistical distributions"""
@@ -312,7 +411,9 @@ class DataAnalyzer:
 
         if output_dir:
             plt.savefig(Path(output_dir) / 'distributions.png', dpi=300)
-        plt.show()
+            plt.close(fig)
+        else:
+            plt.show()
 
     def generate_report(self, output_file=None):
         """Generate comprehensive analysis report"""
@@ -360,22 +461,46 @@ class DataAnalyzer:
         """Compare results across multiple protocol runs"""
         comparison = {}
 
-        # Analyze all files
-        for file in [self.csv_file] + other_files:
-            analyzer = DataAnalyzer(file)
-            if analyzer.load_data():
-                analyzer.calculate_pdr()
-                analyzer.calculate_latency()
-                analyzer.calculate_overhead()
-
-                protocol_name = Path(file).stem
-                comparison[protocol_name] = analyzer.results
+        # Analyze all files; each run is independent, so use one process per file
+        files = [self.csv_file] + other_files
+        with ProcessPoolExecutor() as executor:
+            for file, results in zip(files, executor.map(_analyze_file, files)):
+                if results is not None:
+                    protocol_name = Path(file).stem
+                    comparison[protocol_name] = results
 
         # Create comparison plots
         # ... (implementation for comparison plots)
 
         return comparison
 
+def _analyze_file(csv_file):
+    """Run the comparison metrics on one file (process pool worker)"""
+    # Results are saved next to the CSV and reused until the CSV changes
+    cache_file = Path(csv_file).with_suffix('.results.json')
+    try:
+        if cache_file.stat().st_mtime >= Path(csv_file).stat().st_mtime:
+            with open(cache_file, 'r') as f:
+                return json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    analyzer = DataAnalyzer(csv_file)
+    if not analyzer.load_data():
+        return None
+
+    analyzer.calculate_pdr()
+    analyzer.calculate_latency()
+    analyzer.calculate_overhead()
+
+    try:
+        with open(cache_file, 'w') as f:
+            json.dump(analyzer.results, f, indent=2, default=str)
+    except OSError:
+        pass
+
+    return analyzer.results
+
 def main():
     parser = argparse.ArgumentParser(description='Analyze xMESH experiment data')
     parser.add_argument('csv_file', help='Input CSV file')
@@ -5,26 +5,37 @@ Extract plot data from ANALYSIS.md files for thesis figures
 
 import re
 import json
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+# Patterns are tried in order; the first one with any match wins
+PDR_PATTERNS = [
+    re.compile(r'PDR[:\s]+(\d+\.?\d*)%', re.IGNORECASE),
+    re.compile(r'PDR.*?(\d+\.?\d*)\s*%', re.IGNORECASE),
+    re.compile(r'delivery ratio.*?(\d+\.?\d*)%', re.IGNORECASE),
+]
+
+HELLO_PATTERNS = [
+    re.compile(r'(\d+)\s+HELLO'),
+    re.compile(r'HELLO.*?(\d+)\s+packets'),
+    re.compile(r'(\d+).*?HELLOs'),
+]
+
+NODE_COUNT_PATTERN = re.compile(r'(\d+)node')
+
 def extract_pdr(content):
     """Extract PDR percentage from ANALYSIS content"""
-    patterns = [
-        r'PDR[:\s]+(\d+\.?\d*)%',
-        r'PDR.*?(\d+\.?\d*)\s*%',
-        r'delivery ratio.*?(\d+\.?\d*)%',
-    ]
-    for pattern in patterns:
-        matches = re.findall(pattern, content, re.IGNORECASE)
-        if matches:
-            return float(matches[0])
+    for pattern in PDR_PATTERNS:
+        match = pattern.search(content)
+        if match:
+            return float(match.group(1))
     return None
 
 def extract_node_count(filepath):
     """Extract node count from folder name"""
     path_str = str(filepath)
     # Look for patterns like "3node", "5node", etc.
-    match = re.search(r'(\d+)node', path_str)
+    match = NODE_COUNT_PATTERN.search(path_str)
     if match:
         return int(match.group(1))
     # Look in content
@@ -32,17 +43,23 @@ def extract_node_count(filepath):
 
 def extract_hello_count(content):
     """Extract HELLO packet count"""
-    patterns = [
-        r'(\d+)\s+HELLO',
-        r'HELLO.*?(\d+)\s+packets',
-        r'(\d+).*?HELLOs',
-    ]
-    for pattern in patterns:
-        matches = re.findall(pattern, content)
+    for pattern in HELLO_PATTERNS:
+        matches = pattern.findall(content)
         if matches:
             return [int(m) for m in matches]
     return []
 
+def parse_analysis_file(analysis_file):
+    """Extract metrics from a single ANALYSIS.md file"""
+    content = analysis_file.read_text()
+
+    return {
+        'file': str(analysis_file),
+        'pdr': extract_pdr(content),
+        'nodes': extract_node_count(analysis_file),
+        'hello_counts': extract_hello_count(content)
+    }
+
 def main():
     base_path = Path('experiments/results')
 
@@ -52,34 +69,25 @@ def main():
         'protocol3': []
     }
 
-    # Process each protocol
+    # Find all ANALYSIS.md files for each protocol
+    jobs = []
     for protocol in ['protocol1', 'protocol2', 'protocol3']:
         protocol_path = base_path / protocol
         if not protocol_path.exists():
             print(f"⚠️  {protocol} directory not found")
             continue
 
-        # Find all ANALYSIS.md files
-        for analysis_file in protocol_path.rglob('ANALYSIS.md'):
-            print(f"Processing: {analysis_file}")
-
-            with open(analysis_file, 'r') as f:
-                content = f.read()
+        jobs.extend((protocol, f) for f in protocol_path.rglob('ANALYSIS.md'))
 
-            # Extract metrics
-            pdr = extract_pdr(content)
-            nodes = extract_node_count(analysis_file)
-            hello_counts = extract_hello_count(content)
-
-            test_data = {
-                'file': str(analysis_file),
-                'pdr': pdr,
-                'nodes': nodes,
-                'hello_counts': hello_counts
-            }
+    # Files are independent, so parse them across worker processes
+    with ProcessPoolExecutor() as executor:
+        results = executor.map(parse_analysis_file, [f for _, f in jobs], chunksize=8)
 
+        for (protocol, analysis_file), test_data in zip(jobs, results):
+            print(f"Processing: {analysis_file}")
             data[protocol].append(test_data)
-            print(f"  PDR: {pdr}%, Nodes: {nodes}, HELLOs: {hello_counts}")
+            print(f"  PDR: {test_data['pdr']}%, Nodes: {test_data['nodes']}, "
+                  f"HELLOs: {test_data['hello_counts']}")
 
     # Save extracted data
     output_file = 'raspberry_pi/plot_data.json'
@@ -5,8 +5,11 @@ Output: Publication-quality PNG figures (300 dpi)
 """
 
 import json
+import matplotlib
+matplotlib.use('Agg')  # File output only; no display backend needed
 import matplotlib.pyplot as plt
 import numpy as np
+import pandas as pd
 from pathlib import Path
 
 # Publication quality settings
@@ -27,30 +30,27 @@ def plot_pdr_vs_nodes(data):
     fig, ax = plt.subplots(figsize=(10, 6))
 
     # Aggregate PDR by node count
-    p1_by_nodes = {3: [], 4: [], 5: []}
-    p2_by_nodes = {3: [], 4: [], 5: []}
-    p3_by_nodes = {3: [], 4: [], 5: []}
+    tests = pd.DataFrame([
+        {'protocol': protocol, 'pdr': test['pdr'], 'nodes': test['nodes']}
+        for protocol, protocol_tests in data.items()
+        for test in protocol_tests
+    ], columns=['protocol', 'pdr', 'nodes'])
 
-    # Protocol 1
-    for test in data['protocol1']:
-        if test['pdr'] and test['nodes']:
-            p1_by_nodes[test['nodes']].append(test['pdr'])
-
-    # Protocol 2
-    for test in data['protocol2']:
-        if test['pdr'] and test['nodes']:
-            p2_by_nodes[test['nodes']].append(test['pdr'])
+    # Tests without a PDR or node count are skipped (as are 0% runs)
+    tests = tests[tests['pdr'].fillna(0).astype(bool) & tests['nodes'].fillna(0).astype(bool)]
 
     # Protocol 3 (exclude extreme outdoor test)
-    for test in data['protocol3']:
-        if test['pdr'] and test['nodes'] and test['pdr'] > 80:  # Indoor only
-            p3_by_nodes[test['nodes']].append(test['pdr'])
+    tests = tests[(tests['protocol'] != 'protocol3') | (tests['pdr'] > 80)]  # Indoor only
 
     # Calculate means
     nodes = [3, 4, 5]
-    p1_means = [np.mean(p1_by_nodes[n]) if p1_by_nodes[n] else 0 for n in nodes]
-    p2_means = [np.mean(p2_by_nodes[n]) if p2_by_nodes[n] else 0 for n in nodes]
-    p3_means = [np.mean(p3_by_nodes[n]) if p3_by_nodes[n] else 0 for n in nodes]
+    means = (tests.groupby(['protocol', 'nodes'])['pdr'].mean()
+             .unstack()
+             .reindex(index=['protocol1', 'protocol2', 'protocol3'], columns=nodes)
+             .fillna(0))
+    p1_means = means.loc['protocol1'].tolist()
+    p2_means = means.loc['protocol2'].tolist()
+    p3_means = means.loc['protocol3'].tolist()
 
     # Plot
     x = np.arange(len(nodes))
@@ -9,104 +9,152 @@ Extracts temporal data for:
 """
 
 import re
+import matplotlib
+matplotlib.use('Agg')  # File output only; no display backend needed
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 from datetime import datetime, timedelta
 import numpy as np
+from functools import lru_cache
 from pathlib import Path
 
 # Publication quality settings
 plt.rcParams['figure.dpi'] = 300
-plt.rcParams['savefig.dpi'] = 300
+plt.rcParams['savefig.dpi'] = 300  # Applies to every savefig below
 plt.rcParams['font.size'] = 11
 plt.rcParams['font.family'] = 'serif'
 plt.rcParams['axes.grid'] = True
 plt.rcParams['grid.alpha'] = 0.3
 
+# Log line patterns, compiled once for the per-line loops below.
+# Each one captures the timestamp and its fields in a single scan.
+TIMESTAMP_RE = r'\[(?P<h>\d{2}):(?P<m>\d{2}):(?P<s>\d{2}\.\d{3})\]'
+TIMESTAMP_PATTERN = re.compile(TIMESTAMP_RE)
+TRICKLE_PATTERN = re.compile(TIMESTAMP_RE + r'.*?I=(?P<interval>\d+\.\d+)s')
+ETX_PATTERN = re.compile(TIMESTAMP_RE + r'.*?Link (?P<addr>\w{4}):.*?ETX=(?P<etx>\d+\.\d+)')
+LOAD_PATTERN = re.compile(TIMESTAMP_RE + r'.*?Gateway (?P<addr>\w{4}).*?load=(?P<load>\d+\.\d+)')
+
+def match_seconds(match):
+    """Seconds since midnight from a match of TIMESTAMP_RE"""
+    return float(match['h']) * 3600 + float(match['m']) * 60 + float(match['s'])
+
 def parse_timestamp(line):
     """Extract timestamp from log line [HH:MM:SS.mmm]"""
-    match = re.search(r'\[(\d{2}):(\d{2}):(\d{2}\.\d{3})\]', line)
+    # Fast path: the timestamp normally sits at a fixed offset at line start
+    if line[:1] == '[' and line[3:4] == ':' and line[6:7] == ':' and line[13:14] == ']':
+        try:
+            return int(line[1:3]) * 3600 + int(line[4:6]) * 60 + float(line[7:13])
+        except ValueError:
+            pass
+
+    match = TIMESTAMP_PATTERN.search(line)
     if match:
-        h, m, s = match.groups()
-        return float(h) * 3600 + float(m) * 60 + float(s)
+        return match_seconds(match)
     return None
 
+def normalize_minutes(timestamps):
+    """Seconds to minutes since the first sample, in a single new array"""
+    # Copy once, then work in place; the input may be a cached scan_log series
+    minutes = np.array(timestamps, dtype=np.float64)
+    if minutes.size:
+        minutes /= 60.0
+        minutes -= minutes[0]
+    return minutes
+
+def reset_axes(ax):
+    """Clear the shared plot axes and undo the previous plot's tight_layout"""
+    ax.clear()
+    ax.figure.subplots_adjust(**{
+        side: plt.rcParams[f'figure.subplot.{side}']
+        for side in ('left', 'right', 'bottom', 'top')
+    })
+
+@lru_cache(maxsize=None)
+def scan_log(log_file):
+    """Extract every time series used by the plots in one pass over a log"""
+    with open(log_file, 'rb') as f:
+        data = f.read()
+
+    # Marker counts bound each series, so the arrays are sized up front
+    n_trickle = data.count(b'[Trickle]')
+    n_hello = data.count(b'HELLO')
+
+    trickle_timestamps, intervals = np.empty(n_trickle), np.empty(n_trickle)
+    hello_timestamps = np.empty(n_hello)
+    n_trickle = n_hello = 0
+
+    # Per-address series are kept as separate time/value columns
+    etx_data = {}  # {address: ([timestamp, ...], [etx, ...])}
+    gateway_loads = {}  # {gateway_addr: ([timestamp, ...], [load, ...])}
+
+    for raw in data.splitlines():
+        # Decode only lines that any of the extractors below can use
+        if not (b'[Trickle' in raw or b'HELLO' in raw or b'ETX=' in raw or b'load=' in raw):
+            continue
+        line = raw.decode('utf-8', errors='replace')
+
+        # Match: [Trickle] DOUBLE - I=XXX.Xs
+        if '[Trickle] DOUBLE' in line or '[Trickle] RESET' in line:
+            match = TRICKLE_PATTERN.search(line)
+            if match:
+                trickle_timestamps[n_trickle] = match_seconds(match)
+                intervals[n_trickle] = float(match['interval'])
+                n_trickle += 1
+
+        if '[TrickleHELLO] Sending HELLO' in line or 'SAFETY HELLO' in line:
+            ts = parse_timestamp(line)
+            if ts:
+                hello_timestamps[n_hello] = ts
+                n_hello += 1
+
+        # Match: Link XXXX: RSSI=XX dBm, SNR=XX dB, ETX=X.XX
+        if 'Link' in line and 'ETX=' in line:
+            match = ETX_PATTERN.search(line)
+            if match:
+                addr = match['addr']
+                if addr not in etx_data:
+                    etx_data[addr] = ([], [])
+                link_ts, link_etx = etx_data[addr]
+                link_ts.append(match_seconds(match))
+                link_etx.append(float(match['etx']))
+
+        # Match: [W5] Gateway XXXX load=X.X
+        if '[W5] Gateway' in line and 'load=' in line:
+            match = LOAD_PATTERN.search(line)
+            if match:
+                addr = match['addr']
+                if addr not in gateway_loads:
+                    gateway_loads[addr] = ([], [])
+                gateway_ts, gateway_load = gateway_loads[addr]
+                gateway_ts.append(match_seconds(match))
+                gateway_load.append(float(match['load']))
+
+    return {
+        'trickle': (trickle_timestamps[:n_trickle], intervals[:n_trickle]),
+        # The running HELLO count is just 1..n
+        'hello': (hello_timestamps[:n_hello], np.arange(1, n_hello + 1)),
+        'etx': {addr: (np.array(ts), np.array(etx)) for addr, (ts, etx) in etx_data.items()},
+        'gateway_load': {addr: (np.array(ts), np.array(load))
+                         for addr, (ts, load) in gateway_loads.items()}
+    }
+
 def extract_trickle_progression(log_file):
     """Extract Trickle interval progression from log"""
-    intervals = []
-    timestamps = []
-
-    with open(log_file, 'r') as f:
-        for line in f:
-            # Match: [Trickle] DOUBLE - I=XXX.Xs
-            if '[Trickle] DOUBLE' in line or '[Trickle] RESET' in line:
-                ts = parse_timestamp(line)
-                match = re.search(r'I=(\d+\.\d+)s', line)
-                if ts and match:
-                    interval = float(match.group(1))
-                    timestamps.append(ts)
-                    intervals.append(interval)
-
-    return timestamps, intervals
+    return scan_log(log_file)['trickle']
 
 def extract_hello_cumulative(log_file):
     """Extract cumulative HELLO count over time"""
-    timestamps = []
-    cumulative = []
-    count = 0
-
-    with open(log_file, 'r') as f:
-        for line in f:
-            if '[TrickleHELLO] Sending HELLO' in line or 'SAFETY HELLO' in line:
-                ts = parse_timestamp(line)
-                if ts:
-                    count += 1
-                    timestamps.append(ts)
-                    cumulative.append(count)
-
-    return timestamps, cumulative
+    return scan_log(log_file)['hello']
 
 def extract_etx_timeseries(log_file):
     """Extract ETX values over time for all tracked links"""
-    etx_data = {}  # {address: [(timestamp, etx), ...]}
-
-    with open(log_file, 'r') as f:
-        for line in f:
-            # Match: Link XXXX: RSSI=XX dBm, SNR=XX dB, ETX=X.XX
-            if 'Link' in line and 'ETX=' in line:
-                ts = parse_timestamp(line)
-                addr_match = re.search(r'Link (\w{4}):', line)
-                etx_match = re.search(r'ETX=(\d+\.\d+)', line)
-
-                if ts and addr_match and etx_match:
-                    addr = addr_match.group(1)
-                    etx = float(etx_match.group(1))
-
-                    if addr not in etx_data:
-                        etx_data[addr] = []
-                    etx_data[addr].append((ts, etx))
-
-    return etx_data
+    return scan_log(log_file)['etx']
 
 def extract_gateway_load(log_file):
-    """Extract gateway load over time"""
-    timestamps = []
-    loads = []
-
-    with open(log_file, 'r') as f:
-        for line in f:
-            # Match: [W5] Gateway XXXX load=X.X
-            if '[W5] Gateway' in line and 'load=' in line:
-                ts = parse_timestamp(line)
-                match = re.search(r'load=(\d+\.\d+)', line)
-                if ts and match:
-                    load = float(match.group(1))
-                    timestamps.append(ts)
-                    loads.append(load)
-
-    return timestamps, loads
-
-def plot_trickle_interval_progression():
+    """Extract gateway load over time, per gateway: {addr: (timestamps, loads)}"""
+    return scan_log(log_file)['gateway_load']
+
+def plot_trickle_interval_progression(ax):
     """Generate Figure: Trickle Interval Progression Over Time"""
     # Use cold-start test log (captures initial 60s→600s progression)
     log_file = Path('experiments/results/protocol3/5node_validation_suite/5node_sensors_coldstart_20251114_230621/node2_20251114_230621.log')
@@ -117,15 +165,14 @@ def plot_trickle_interval_progression():
 
     timestamps, intervals = extract_trickle_progression(log_file)
 
-    if not timestamps:
+    if not len(timestamps):
         print("⚠️  No Trickle data found")
         return
 
     # Convert to minutes
-    timestamps = np.array(timestamps) / 60.0
-    timestamps = timestamps - timestamps[0]  # Start at t=0
+    timestamps = normalize_minutes(timestamps)
 
-    fig, ax = plt.subplots(figsize=(12, 6))
+    reset_axes(ax)
 
     # Plot interval progression
     ax.plot(timestamps, intervals, 'o-', color='#2E7D32', linewidth=2,
@@ -151,22 +198,23 @@ def plot_trickle_interval_progression():
 
     # Annotations
     if len(timestamps) > 0:
-        # Find when I_max first reached
-        idx_max = np.where(np.array(intervals) >= 600)[0]
-        if len(idx_max) > 0:
-            t_max = timestamps[idx_max[0]]
+        # Find when I_max first reached (RESETs make the series non-monotonic,
+        # so take the first hit of the mask rather than a binary search)
+        at_max = intervals >= 600
+        idx_max = int(at_max.argmax())
+        if at_max[idx_max]:
+            t_max = timestamps[idx_max]
             ax.annotate(f'I_max reached\nat {t_max:.1f} min',
                        xy=(t_max, 600), xytext=(t_max + 10, 550),
                        arrowprops=dict(arrowstyle='->', color='red', lw=1.5),
                        fontsize=10, color='red', fontweight='bold')
 
-    plt.tight_layout()
+    ax.figure.tight_layout()
     output = 'proposal_docs/images/figure_timeseries_trickle_interval.png'
-    plt.savefig(output, dpi=300, bbox_inches='tight')
+    ax.figure.savefig(output, bbox_inches='tight')
     print(f"✅ Trickle interval progression saved: {output}")
-    plt.close()
 
-def plot_hello_cumulative_comparison():
+def plot_hello_cumulative_comparison(ax):
     """Generate Figure: Cumulative HELLO Count Protocol 2 vs 3"""
     # Protocol 2: 30-minute test
     p2_log = Path('experiments/results/protocol2/3node_30min_val_10dBm_20251110_182442/node2_20251110_182442.log')
@@ -174,14 +222,13 @@ def plot_hello_cumulative_comparison():
     # Protocol 3: 30-minute comparable test
     p3_log = Path('experiments/results/protocol3/5node_validation_suite/5node_sensors_coldstart_20251114_230621/node2_20251114_230621.log')
 
-    fig, ax = plt.subplots(figsize=(12, 6))
+    reset_axes(ax)
 
     # Protocol 2: Fixed 120s intervals (theoretical)
     if p2_log.exists():
         ts_p2, cum_p2 = extract_hello_cumulative(p2_log)
-        if ts_p2:
-            ts_p2 = np.array(ts_p2) / 60.0  # Convert to minutes
-            ts_p2 = ts_p2 - ts_p2[0]
+        if len(ts_p2):
+            ts_p2 = normalize_minutes(ts_p2)
             ax.plot(ts_p2, cum_p2, 's-', color='#1976D2', linewidth=2,
                    markersize=6, label='Protocol 2 (Fixed 120s)',
                    markerfacecolor='white', markeredgewidth=2)
@@ -196,16 +243,15 @@ def plot_hello_cumulative_comparison():
     # Protocol 3: Adaptive Trickle
     if p3_log.exists():
         ts_p3, cum_p3 = extract_hello_cumulative(p3_log)
-        if ts_p3:
-            ts_p3 = np.array(ts_p3) / 60.0
-            ts_p3 = ts_p3 - ts_p3[0]
+        if len(ts_p3):
+            ts_p3 = normalize_minutes(ts_p3)
             ax.plot(ts_p3, cum_p3, 'o-', color='#388E3C', linewidth=2,
                    markersize=6, label='Protocol 3 (Trickle Adaptive)',
                    markerfacecolor='white', markeredgewidth=2)
 
             # Calculate reduction
             final_p2 = 15  # Expected for 30min
-            final_p3 = cum_p3[-1] if cum_p3 else 0
+            final_p3 = cum_p3[-1] if len(cum_p3) else 0
             reduction = ((final_p2 - final_p3) / final_p2) * 100
 
             ax.text(0.98, 0.02, f'Reduction: {reduction:.1f}%\n({final_p2} → {final_p3} HELLOs)',
@@ -221,13 +267,12 @@ def plot_hello_cumulative_comparison():
     ax.legend(loc='upper left', fontsize=10)
     ax.grid(True, alpha=0.3)
 
-    plt.tight_layout()
+    ax.figure.tight_layout()
     output = 'proposal_docs/images/figure_timeseries_hello_cumulative.png'
-    plt.savefig(output, dpi=300, bbox_inches='tight')
+    ax.figure.savefig(output, bbox_inches='tight')
     print(f"✅ HELLO cumulative comparison saved: {output}")
-    plt.close()
 
-def plot_etx_timeseries():
+def plot_etx_timeseries(ax):
     """Generate Figure: ETX Link Quality Over Time"""
     # Use outdoor multi-hop test with multiple links
     log_file = Path('experiments/results/protocol3/4node_physical_long_distance_suite/gateways-cold_20251119_182553/node1_20251119_182553.log')
@@ -242,14 +287,12 @@ def plot_etx_timeseries():
         print("⚠️  No ETX data found")
         return
 
-    fig, ax = plt.subplots(figsize=(12, 6))
+    reset_axes(ax)
 
     colors = ['#D32F2F', '#1976D2', '#388E3C', '#F57C00', '#7B1FA2']
-    for i, (addr, data) in enumerate(etx_data.items()):
-        if data:
-            ts = np.array([d[0] for d in data]) / 60.0  # Convert to minutes
-            ts = ts - ts[0]
-            etx = [d[1] for d in data]
+    for i, (addr, (ts, etx)) in enumerate(etx_data.items()):
+        if len(ts):
+            ts = normalize_minutes(ts)
 
             ax.plot(ts, etx, 'o-', color=colors[i % len(colors)],
                    linewidth=2, markersize=5, label=f'Link {addr}',
@@ -272,13 +315,12 @@ def plot_etx_timeseries():
     ax.set_ylim([0.5, 4.0])
     ax.grid(True, alpha=0.3)
 
-    plt.tight_layout()
+    ax.figure.tight_layout()
     output = 'proposal_docs/images/figure_timeseries_etx_evolution.png'
-    plt.savefig(output, dpi=300, bbox_inches='tight')
+    ax.figure.savefig(output, bbox_inches='tight')
     print(f"✅ ETX time-series saved: {output}")
-    plt.close()
 
-def plot_gateway_load_timeseries():
+def plot_gateway_load_timeseries(ax):
     """Generate Figure: Gateway Load Distribution Over Time"""
     # Use dual-gateway W5 test
     log_file = Path('experiments/results/protocol3/4node_physical_long_distance_suite/gateways-cold_20251119_182553/node1_20251119_182553.log')
@@ -288,35 +330,18 @@ def plot_gateway_load_timeseries():
         return
 
     # Extract load data for multiple gateways
-    gateway_loads = {}  # {gateway_addr: [(timestamp, load), ...]}
-
-    with open(log_file, 'r') as f:
-        for line in f:
-            if '[W5] Gateway' in line and 'load=' in line:
-                ts = parse_timestamp(line)
-                addr_match = re.search(r'Gateway (\w{4})', line)
-                load_match = re.search(r'load=(\d+\.\d+)', line)
-
-                if ts and addr_match and load_match:
-                    addr = addr_match.group(1)
-                    load = float(load_match.group(1))
-
-                    if addr not in gateway_loads:
-                        gateway_loads[addr] = []
-                    gateway_loads[addr].append((ts, load))
+    gateway_loads = extract_gateway_load(log_file)
 
     if not gateway_loads:
         print("⚠️  No gateway load data found")
         return
 
-    fig, ax = plt.subplots(figsize=(12, 6))
+    reset_axes(ax)
 
     colors = ['#1976D2', '#D32F2F', '#388E3C']
-    for i, (addr, data) in enumerate(gateway_loads.items()):
-        if data:
-            ts = np.array([d[0] for d in data]) / 60.0
-            ts = ts - ts[0]
-            load = [d[1] for d in data]
+    for i, (addr, (ts, load)) in enumerate(gateway_loads.items()):
+        if len(ts):
+            ts = normalize_minutes(ts)
 
             ax.plot(ts, load, 'o-', color=colors[i % len(colors)],
                    linewidth=2, markersize=6, label=f'Gateway {addr}',
@@ -332,23 +357,27 @@ def plot_gateway_load_timeseries():
     ax.set_title('W5 Gateway Load Distribution Over Time (Dual-Gateway Test)',
                  fontsize=14, fontweight='bold')
     ax.legend(loc='upper right', fontsize=10)
-    ax.set_ylim([-0.1, max([max([d[1] for d in data]) for data in gateway_loads.values()]) + 0.3])
+    ymax = max(load.max() for _, load in gateway_loads.values())
+    ax.set_ylim([-0.1, ymax + 0.3])
     ax.grid(True, alpha=0.3)
 
-    plt.tight_layout()
+    ax.figure.tight_layout()
     output = 'proposal_docs/images/figure_timeseries_gateway_load.png'
-    plt.savefig(output, dpi=300, bbox_inches='tight')
+    ax.figure.savefig(output, bbox_inches='tight')
     print(f"✅ Gateway load time-series saved: {output}")
-    plt.close()
 
 def main():
     print("Generating time-series plots from test logs...\n")
 
+    # All plots are 12x6, so draw them in turn on one figure
+    fig, ax = plt.subplots(figsize=(12, 6))
+
     # Generate all plots
-    plot_trickle_interval_progression()
-    plot_hello_cumulative_comparison()
-    plot_etx_timeseries()
-    plot_gateway_load_timeseries()
+    plot_trickle_interval_progression(ax)
+    plot_hello_cumulative_comparison(ax)
+    plot_etx_timeseries(ax)
+    plot_gateway_load_timeseries(ax)
+    plt.close(fig)
 
     print("\n✅ All time-series plots generated successfully!")
     print("Output directory: proposal_docs/images/")
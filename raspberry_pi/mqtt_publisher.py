@@ -15,12 +15,40 @@ import sys
 from pathlib import Path
 import paho.mqtt.client as mqtt
 from datetime import datetime
-import struct
+import time
 import re
-import ssl
-import certifi
+import logging
+import logging.handlers
+
+# orjson serializes payloads several times faster; stdlib json is the fallback
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Serial echo and publish notices go through a memory buffer that is written
+# out in batches (every CONSOLE_FLUSH_INTERVAL seconds, or at once on errors)
+CONSOLE_FLUSH_INTERVAL = 0.5
+console = logging.getLogger('xmesh.mqtt_publisher')
+console.setLevel(logging.INFO)
+console.propagate = False
+console_handler = logging.handlers.MemoryHandler(
+    capacity=256,
+    flushLevel=logging.ERROR,
+    target=logging.StreamHandler(sys.stdout)
+)
+console.addHandler(console_handler)
 
 class xMESH_MQTT_Publisher:
+    # Serial line patterns, compiled once rather than per packet.
+    # PM/GPS are applied with match(): the lines start with their prefix.
+    SEQ_PATTERN = re.compile(r"Seq=(\d+)")
+    SRC_PATTERN = re.compile(r"From=([A-Fa-f0-9]+)")
+    PM_PATTERN = re.compile(r"PM:\s*1\.0=([0-9.]+)\s*2\.5=([0-9.]+)\s*10=([0-9.]+)")
+    GPS_PATTERN = re.compile(
+        r"GPS:\s*([0-9.+-]+)[^0-9NS]*([NS]),\s*([0-9.+-]+)[^0-9EW]*([EW]),\s*alt=([0-9.+-]+)m,\s*(\d+)\s*sats"
+    )
+
     def __init__(self, serial_port, baudrate, mqtt_config_file):
         self.serial_port = serial_port
         self.baudrate = baudrate
@@ -73,6 +101,10 @@ class xMESH_MQTT_Publisher:
 
             # TLS configuration
             if self.mqtt_config.get('use_tls', False):
+                # Only TLS setups need these; skip the import cost otherwise
+                import ssl
+                import certifi
+
                 ca_path = self.mqtt_config.get('ca_cert') or certifi.where()
                 self.mqtt_client.tls_set(
                     ca_certs=ca_path,
@@ -129,72 +161,121 @@ class xMESH_MQTT_Publisher:
           PM: 1.0=12 2.5=15 10=18 µg/m³ (AQI: Good)
           GPS: 13.727800°N, 100.775300°E, alt=25.5m, 7 sats (Excellent)
         """
-        packet_to_publish = None
+        # Dispatch on the line prefix; anything else is plain gateway logging
+        handler = self.LINE_HANDLERS.get(line[:3])
+        if handler is None:
+            return None
 
         try:
-            # New packet header
-            if line.startswith("RX:"):
-                seq_match = re.search(r"Seq=(\d+)", line)
-                src_match = re.search(r"From=([A-Fa-f0-9]+)", line)
-
-                # Publish previous packet if we have one ready
-                if self.current_packet and (
-                    self.current_packet.get('pm1_0') is not None or
-                    self.current_packet.get('latitude') is not None
-                ):
-                    packet_to_publish = self.current_packet
-
-                if seq_match and src_match:
-                    self.current_packet = {
-                        'sequence': int(seq_match.group(1)),
-                        'src': src_match.group(1),
-                        'timestamp': datetime.now().isoformat()
-                    }
-                else:
-                    self.current_packet = None
+            return handler(self, line)
+        except Exception as e:
+            return None
 
-            # PM line
-            elif line.startswith("PM:") and self.current_packet:
-                pm_match = re.search(
-                    r"PM:\s*1\.0=([0-9.]+)\s*2\.5=([0-9.]+)\s*10=([0-9.]+)",
-                    line
-                )
-                if pm_match:
-                    self.current_packet['pm1_0'] = float(pm_match.group(1))
-                    self.current_packet['pm2_5'] = float(pm_match.group(2))
-                    self.current_packet['pm10'] = float(pm_match.group(3))
-
-            # GPS line
-            elif line.startswith("GPS:") and self.current_packet:
-                gps_match = re.search(
-                    r"GPS:\s*([0-9.+-]+)[^0-9NS]*([NS]),\s*([0-9.+-]+)[^0-9EW]*([EW]),\s*alt=([0-9.+-]+)m,\s*(\d+)\s*sats",
-                    line
-                )
-                if gps_match:
-                    lat_val = float(gps_match.group(1))
-                    lat_dir = gps_match.group(2)
-                    lon_val = float(gps_match.group(3))
-                    lon_dir = gps_match.group(4)
-                    alt_val = float(gps_match.group(5))
-                    sats_val = int(gps_match.group(6))
+    def _parse_rx_line(self, line):
+        """New packet header: returns the previous packet if it is ready"""
+        packet_to_publish = None
 
-                    latitude = lat_val if lat_dir == 'N' else -lat_val
-                    longitude = lon_val if lon_dir == 'E' else -lon_val
+        seq_match = self.SEQ_PATTERN.search(line)
+        src_match = self.SRC_PATTERN.search(line)
+
+        # Publish previous packet if we have one ready
+        if self.current_packet and (
+            self.current_packet.get('pm1_0') is not None or
+            self.current_packet.get('latitude') is not None
+        ):
+            packet_to_publish = self.current_packet
+
+        if seq_match and src_match:
+            self.current_packet = {
+                'sequence': int(seq_match.group(1)),
+                'src': src_match.group(1),
+                # Raw clock reading; formatted only if the packet is published
+                'ts_ns': time.time_ns()
+            }
+        else:
+            self.current_packet = None
 
-                    self.current_packet['latitude'] = latitude
-                    self.current_packet['longitude'] = longitude
-                    self.current_packet['altitude'] = alt_val
-                    self.current_packet['satellites'] = sats_val
-                    self.current_packet['gps_valid'] = True
+        return packet_to_publish
 
-                    packet_to_publish = self.current_packet
-                    self.current_packet = None
+    def _parse_pm_line(self, line):
+        """PM line: adds particulate readings to the current packet"""
+        if not self.current_packet:
+            return None
 
-            return packet_to_publish
+        pm_match = self.PM_PATTERN.match(line)
+        if pm_match:
+            self.current_packet['pm1_0'] = float(pm_match.group(1))
+            self.current_packet['pm2_5'] = float(pm_match.group(2))
+            self.current_packet['pm10'] = float(pm_match.group(3))
 
-        except Exception as e:
+        return None
+
+    def _parse_gps_line(self, line):
+        """GPS line: completes the current packet and returns it"""
+        if not self.current_packet:
+            return None
+
+        fields = self._split_gps_fields(line)
+        if fields is None:
+            # Unusual formatting; fall back to the full pattern
+            gps_match = self.GPS_PATTERN.match(line)
+            if not gps_match:
+                return None
+            fields = (float(gps_match.group(1)), gps_match.group(2),
+                      float(gps_match.group(3)), gps_match.group(4),
+                      float(gps_match.group(5)), int(gps_match.group(6)))
+
+        lat_val, lat_dir, lon_val, lon_dir, alt_val, sats_val = fields
+
+        latitude = lat_val if lat_dir == 'N' else -lat_val
+        longitude = lon_val if lon_dir == 'E' else -lon_val
+
+        self.current_packet['latitude'] = latitude
+        self.current_packet['longitude'] = longitude
+        self.current_packet['altitude'] = alt_val
+        self.current_packet['satellites'] = sats_val
+        self.current_packet['gps_valid'] = True
+
+        packet_to_publish = self.current_packet
+        self.current_packet = None
+        return packet_to_publish
+
+    @staticmethod
+    def _split_gps_fields(line):
+        """
+        Fast path for the firmware's fixed GPS layout:
+        GPS: 13.727800°N, 100.775300°E, alt=25.5m, 7 sats (Excellent)
+        Returns None if the line does not have exactly that shape.
+        """
+        # LINE_HANDLERS only checked 'GPS'; the colon is part of the format
+        if not line.startswith('GPS:'):
+            return None
+        try:
+            lat_s, lon_s, alt_s, sats_s = line[4:].split(',', 3)
+            lat_s = lat_s.strip()
+            lon_s = lon_s.strip()
+            alt_s = alt_s.strip()
+            sats_count, sats_word = sats_s.split(None, 2)[:2]
+
+            lat_dir = lat_s[-1]
+            lon_dir = lon_s[-1]
+            if (lat_dir not in 'NS' or lon_dir not in 'EW' or sats_word != 'sats'
+                    or not alt_s.startswith('alt=') or not alt_s.endswith('m')):
+                return None
+
+            return (float(lat_s[:-1].rstrip('°')), lat_dir,
+                    float(lon_s[:-1].rstrip('°')), lon_dir,
+                    float(alt_s[4:-1]), int(sats_count))
+        except (ValueError, IndexError):
             return None
 
+    # Line prefix (first three characters) -> parser
+    LINE_HANDLERS = {
+        'RX:': _parse_rx_line,
+        'PM:': _parse_pm_line,
+        'GPS': _parse_gps_line,
+    }
+
     def publish_sensor_data(self, packet_data):
         """Publish parsed sensor data to MQTT topics"""
         if not self.mqtt_client or not packet_data:
@@ -206,9 +287,12 @@ class xMESH_MQTT_Publisher:
                 node_id=packet_data.get('src', 'unknown')
             )
 
+            ts_ns = packet_data.get('ts_ns')
+            timestamp = datetime.fromtimestamp(ts_ns / 1e9).isoformat() if ts_ns is not None else None
+
             # Create JSON payload
-            payload = json.dumps({
-                'timestamp': packet_data.get('timestamp'),
+            message = {
+                'timestamp': timestamp,
                 'sequence': packet_data.get('sequence'),
                 'source': packet_data.get('src'),
                 'pm1_0': packet_data.get('pm1_0', 0),
@@ -219,7 +303,9 @@ class xMESH_MQTT_Publisher:
                 'altitude': packet_data.get('altitude', 0.0),
                 'satellites': packet_data.get('satellites', 0),
                 'gps_valid': packet_data.get('gps_valid', False)
-            })
+            }
+            # paho accepts the bytes from orjson as-is
+            payload = orjson.dumps(message) if orjson else json.dumps(message)
 
             # Publish with QoS=1 (at least once delivery)
             result = self.mqtt_client.publish(
@@ -229,14 +315,14 @@ class xMESH_MQTT_Publisher:
             )
 
             if result.rc == mqtt.MQTT_ERR_SUCCESS:
-                print(f"📤 Published to {topic}: Seq={packet_data.get('sequence')}")
+                console.info(f"📤 Published to {topic}: Seq={packet_data.get('sequence')}")
                 return True
             else:
                 self.stats['mqtt_errors'] += 1
                 return False
 
         except Exception as e:
-            print(f"❌ Publish error: {e}")
+            console.error(f"❌ Publish error: {e}")
             self.stats['mqtt_errors'] += 1
             return False
 
@@ -260,30 +346,46 @@ class xMESH_MQTT_Publisher:
         print("Press Ctrl+C to stop\n")
 
         try:
+            pending = b''
+            last_flush = time.monotonic()
             while self.running:
-                if self.serial_conn.in_waiting > 0:
-                    line = self.serial_conn.readline().decode('utf-8', errors='ignore').strip()
-
-                    # Print to console for monitoring
-                    print(line)
-
-                    # Parse and publish sensor packets
-                    packet_data = self.parse_sensor_packet(line)
-                    if packet_data:
-                        self.stats['packets_received'] += 1
-                        if self.mqtt_client:
-                            self.publish_sensor_data(packet_data)
-
-                    # Print statistics every 60 seconds
-                    if self.stats['packets_received'] > 0 and self.stats['packets_received'] % 10 == 0:
-                        self.print_stats()
+                # Block for the first byte (up to the serial timeout), then
+                # drain everything already queued in one read
+                chunk = self.serial_conn.read(max(1, self.serial_conn.in_waiting))
+                if chunk:
+                    # Keep any trailing partial line for the next read
+                    *lines, pending = (pending + chunk).split(b'\n')
+                    for raw in lines:
+                        self.process_line(raw.decode('utf-8', errors='ignore').strip())
+
+                now = time.monotonic()
+                if now - last_flush >= CONSOLE_FLUSH_INTERVAL:
+                    console_handler.flush()
+                    last_flush = now
 
         except KeyboardInterrupt:
             print("\n\n⏹️  Stopping MQTT publisher...")
             self.shutdown()
 
+    def process_line(self, line):
+        """Handle one line of gateway serial output"""
+        # Echo to console for monitoring
+        console.info(line)
+
+        # Parse and publish sensor packets
+        packet_data = self.parse_sensor_packet(line)
+        if packet_data:
+            self.stats['packets_received'] += 1
+            if self.mqtt_client:
+                self.publish_sensor_data(packet_data)
+
+        # Print statistics every 60 seconds
+        if self.stats['packets_received'] > 0 and self.stats['packets_received'] % 10 == 0:
+            self.print_stats()
+
     def print_stats(self):
         """Print current statistics"""
+        console_handler.flush()
         elapsed = (datetime.now() - self.stats['start_time']).total_seconds()
         print(f"\n📊 Stats: {self.stats['packets_received']} RX, " +
               f"{self.stats['packets_published']} published, " +
@@ -293,6 +395,7 @@ class xMESH_MQTT_Publisher:
     def shutdown(self):
         """Clean shutdown"""
         self.running = False
+        console_handler.flush()
 
         if self.mqtt_client:
             self.mqtt_client.loop_stop()
@@ -4,171 +4,305 @@ Multi-Node Serial Capture for xMESH Testing
 Captures log output from multiple nodes simultaneously
 """
 
+import re
+import numpy as np
 import serial
-import threading
+import selectors
 import time
 import argparse
+import os
 import sys
 import signal
 from datetime import datetime
 from pathlib import Path
 
 class NodeCapture:
-    def __init__(self, node_id, port, baudrate, output_file):
+    # Events are classified on the raw line bytes, so the multi-byte markers
+    # µg/m³, °N and °E are tested as their UTF-8 sequences; regexes are only
+    # used to pull fields out of lines already classified
+    PM_UNIT = b"\xc2\xb5g/m\xc2\xb3"
+    DEG_N = b"\xc2\xb0N"
+    DEG_E = b"\xc2\xb0E"
+    # PM reading: the text between [PMS] and the first µg/m³ after it
+    PM_VALUE_PATTERN = re.compile(rb"\[PMS\](.*?)\xc2\xb5g/m\xc2\xb3")
+    # GPS coordinates: the text between [GPS] and the first °E after it
+    GPS_COORD_PATTERN = re.compile(rb"\[GPS\](.*?)\xc2\xb0E")
+    # Doubled Trickle interval: everything after the first I= up to an 's'
+    INTERVAL_PATTERN = re.compile(rb"I=([^s]*)")
+    # Raw-bytes prefilter: a line without any of these carries no event
+    EVENT_MARKER_PATTERN = re.compile(
+        rb"TX:|RX:|\[Trickle|\[TRICKLE\]|\[TOPOLOGY\]|\[COST\]|\[PMS\]|\[GPS\]"
+        rb"|Creating Routing Packet"
+    )
+    # Counter layout of NodeCapture.counts (names match get_stats keys)
+    COUNTERS = ('lines', 'tx', 'rx',
+                'trickle_hello', 'trickle_suppress', 'trickle_double', 'trickle_reset',
+                'loramesh_hello',  # Should be 0 if Trickle working
+                'topology_changes', 'cost_evals',
+                'pm_readings', 'gps_readings')
+    (LINES, TX, RX,
+     TRICKLE_HELLO, TRICKLE_SUPPRESS, TRICKLE_DOUBLE, TRICKLE_RESET,
+     LORAMESH_HELLO,
+     TOPOLOGY_CHANGES, COST_EVALS,
+     PM_READINGS, GPS_READINGS) = range(len(COUNTERS))
+    # Bytes requested from the serial fd per read
+    READ_SIZE = 65536
+    # Seconds between log writes; _log_buf absorbs everything in between
+    FLUSH_INTERVAL = 1.0
+
+    def __init__(self, node_id, port, baudrate, output_file, verbose=True):
         self.node_id = node_id
         self.port = port
         self.baudrate = baudrate
         self.output_file = output_file
         self.serial_conn = None
         self.running = False
-        self.thread = None
+        self._log_file = None
+        self._log_buf = bytearray()  # formatted log lines not yet written
+        self.verbose = verbose
+        self.fd = None
+        self._stdout_buf = []  # event lines printed once per read
+        self._rx_buf = bytearray()  # bytes read but not yet split into lines
+        # Fixed read buffer reused by every read_available() call
+        self._read_buf = bytearray(self.READ_SIZE)
+        self._read_view = memoryview(self._read_buf)
+        self._last_flush = 0.0
         self.packet_count = 0
-        self.line_count = 0
-        self.tx_count = 0
-        self.rx_count = 0
-        # Trickle-specific metrics
-        self.trickle_hello_count = 0
-        self.trickle_suppress_count = 0
-        self.trickle_double_count = 0
-        self.trickle_reset_count = 0
-        self.loramesh_hello_count = 0  # Should be 0 if Trickle working
-        self.topology_changes = 0
-        self.cost_evaluations = 0
-        # Sensor data tracking (PM + GPS)
-        self.pm_readings = 0
-        self.gps_readings = 0
+        # Line, event, Trickle and sensor counters, indexed by COUNTERS
+        self.counts = np.zeros(len(self.COUNTERS), dtype=np.int64)
 
     def start(self):
-        """Start capture thread"""
+        """Open the serial port and the log file"""
         try:
             self.serial_conn = serial.Serial(
                 port=self.port,
                 baudrate=self.baudrate,
                 timeout=1
             )
+            self.fd = self.serial_conn.fileno()
             print(f"[Node {self.node_id}] Connected to {self.port}")
 
+            # Line timestamps are wall-clock time of day advanced by the monotonic clock
+            started = datetime.now()
+            self._t0_mono = time.monotonic()
+            self._t0_day = (started.hour * 3600 + started.minute * 60 + started.second
+                            + started.microsecond / 1e6)
+
+            self._log_file = open(self.output_file, 'wb')
+            header = (f"=== Node {self.node_id} Capture Log ===\n"
+                      f"Port: {self.port}\n"
+                      f"Started: {started.isoformat()}\n"
+                      + "=" * 50 + "\n\n")
+            self._log_file.write(header.encode('utf-8'))
+
             self.running = True
-            self.thread = threading.Thread(target=self._capture_loop, daemon=True)
-            self.thread.start()
             return True
         except Exception as e:
             print(f"[Node {self.node_id}] Error: {e}")
             return False
 
-    def _capture_loop(self):
-        """Main capture loop"""
-        with open(self.output_file, 'w') as f:
-            f.write(f"=== Node {self.node_id} Capture Log ===\n")
-            f.write(f"Port: {self.port}\n")
-            f.write(f"Started: {datetime.now().isoformat()}\n")
-            f.write("=" * 50 + "\n\n")
+    def fileno(self):
+        """Serial port file descriptor, for registering with a selector"""
+        return self.fd
 
-            while self.running:
-                try:
-                    if self.serial_conn.in_waiting > 0:
-                        line = self.serial_conn.readline().decode('utf-8', errors='ignore').strip()
-                        if line:
-                            self.line_count += 1
-                            timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-
-                            # Write to file
-                            f.write(f"[{timestamp}] {line}\n")
-                            f.flush()
-
-                            # Parse and count events
-                            if "TX:" in line:
-                                self.tx_count += 1
-                                print(f"[Node {self.node_id}] {timestamp} TX detected")
-                            elif "RX:" in line:
-                                self.rx_count += 1
-                                print(f"[Node {self.node_id}] {timestamp} RX detected")
-
-                            # Trickle-specific events
-                            if "[TrickleHELLO] Sending HELLO" in line:
-                                self.trickle_hello_count += 1
-                                print(f"[Node {self.node_id}] {timestamp} 📡 TRICKLE HELLO #{self.trickle_hello_count}")
-                            elif "[Trickle] SUPPRESS" in line:
-                                self.trickle_suppress_count += 1
-                                print(f"[Node {self.node_id}] {timestamp} 🔇 SUPPRESSED")
-                            elif "[Trickle] DOUBLE" in line:
-                                self.trickle_double_count += 1
-                                # Extract interval if possible
-                                if "I=" in line:
-                                    try:
-                                        interval = line.split("I=")[1].split("s")[0]
-                                        print(f"[Node {self.node_id}] {timestamp} ⏫ INTERVAL DOUBLED to {interval}s")
-                                    except:
-                                        print(f"[Node {self.node_id}] {timestamp} ⏫ INTERVAL DOUBLED")
-                            elif "[Trickle] RESET" in line or "[TRICKLE] Topology change" in line:
-                                self.trickle_reset_count += 1
-                                print(f"[Node {self.node_id}] {timestamp} 🔄 TRICKLE RESET")
-                            elif "[TOPOLOGY]" in line:
-                                self.topology_changes += 1
-                                print(f"[Node {self.node_id}] {timestamp} 🌐 TOPOLOGY CHANGE")
-                            elif "Creating Routing Packet" in line and "[TrickleHELLO]" not in line:
-                                # This would be LoRaMesher's HELLO (should NOT happen with Trickle)
-                                self.loramesh_hello_count += 1
-                                print(f"[Node {self.node_id}] {timestamp} ⚠️  LORAMESH HELLO (unexpected!)")
-                            elif "[COST]" in line and "Route to" in line:
-                                self.cost_evaluations += 1
-
-                            # PM sensor data tracking
-                            if "[PMS]" in line and "µg/m³" in line:
-                                self.pm_readings += 1
-                                print(f"[Node {self.node_id}] {timestamp} 💨 PM Data: {line.split('µg/m³')[0].split('[PMS]')[1].strip()}")
-
-                            # GPS data tracking
-                            if "[GPS]" in line and ("°N" in line or "sats" in line):
-                                self.gps_readings += 1
-                                # Extract coordinates if present
-                                if "°N" in line and "°E" in line:
-                                    try:
-                                        coords = line.split("°E")[0].split("[GPS]")[1].strip()
-                                        print(f"[Node {self.node_id}] {timestamp} 📍 GPS: {coords}")
-                                    except:
-                                        print(f"[Node {self.node_id}] {timestamp} 📍 GPS Update")
-
-                            # PM data in transmission (enhanced packets)
-                            if "PM:" in line and "µg/m³" in line and ("TX:" in line or "RX:" in line):
-                                # This captures PM data in TX/RX messages
-                                if "PM: 1.0=" in line or "PM1.0" in line:
-                                    print(f"[Node {self.node_id}] {timestamp} 📦 PM in packet: {line}")
+    def _timestamp(self):
+        """Current time of day as b'HH:MM:SS.mmm'"""
+        ms = int((self._t0_day + time.monotonic() - self._t0_mono) * 1000)
+        s = ms // 1000
+        return b'%02d:%02d:%02d.%03d' % ((s // 3600) % 24, (s // 60) % 60, s % 60, ms % 1000)
 
-                except Exception as e:
-                    if self.running:
-                        print(f"[Node {self.node_id}] Read error: {e}")
-                        time.sleep(0.1)
+    def read_available(self):
+        """Read whatever the port has into the fixed buffer and process it; 0 means EOF"""
+        try:
+            n = os.readv(self.fd, [self._read_view])
+        except BlockingIOError:
+            return None  # spurious wakeup, nothing to read yet
+        if n:
+            self.process_chunk(self._read_view[:n])
+        return n
+
+    def process_chunk(self, data):
+        """Append raw serial bytes, then log and count every complete line"""
+        buf = self._rx_buf
+        buf += data
+        end = buf.rfind(b'\n')
+        if end < 0:
+            return
+
+        # Lines from the same read share one timestamp
+        ts = self._timestamp()
+        log_buf = self._log_buf
+        line_count = 0
+        start = 0
+        try:
+            while start <= end:
+                newline = buf.find(b'\n', start)
+                raw = buf[start:newline].strip()
+                start = newline + 1
+                if not raw:
+                    continue
+                if not raw.isascii():
+                    # Drop undecodable bytes (boot noise) so the log stays valid UTF-8
+                    raw = raw.decode('utf-8', errors='ignore').strip().encode('utf-8')
+                    if not raw:
+                        continue
+                line_count += 1
+
+                # Write to file
+                log_buf += b'[%s] %s\n' % (ts, raw)
+
+                # Only lines carrying an event marker go through the regex; nothing
+                # is decoded unless a handler prints it
+                if self.EVENT_MARKER_PATTERN.search(raw):
+                    self._dispatch_events(raw, ts)
+        finally:
+            # Consume the batch even if a handler raised, so it is not replayed
+            del buf[:end + 1]
+            self.counts[self.LINES] += line_count
+        self.flush_if_due()
+
+        if self._stdout_buf:
+            sys.stdout.write(''.join(self._stdout_buf))
+            self._stdout_buf.clear()
+
+    def flush_if_due(self):
+        """Write buffered log lines to disk at most once per FLUSH_INTERVAL"""
+        now = time.monotonic()
+        if now - self._last_flush >= self.FLUSH_INTERVAL:
+            self._write_log()
+            self._last_flush = now
+
+    def _write_log(self):
+        """Hand the whole log buffer to the file in one write and flush it"""
+        if self._log_buf:
+            self._log_file.write(self._log_buf)
+            self._log_buf.clear()
+        self._log_file.flush()
+
+    def _emit(self, ts, message, *fields):
+        """Queue an event line for the console; bytes fields are decoded only if printed"""
+        if self.verbose:
+            text = message.format(*(field.decode('utf-8').strip() for field in fields))
+            self._stdout_buf.append(f"[Node {self.node_id}] {ts.decode('ascii')} {text}\n")
+
+    def _dispatch_events(self, raw, ts):
+        """Count and report the events on one line"""
+        # Parse and count events
+        if b"TX:" in raw:
+            self._on_tx(raw, ts)
+        elif b"RX:" in raw:
+            self._on_rx(raw, ts)
+
+        # Trickle-specific events
+        if b"[TrickleHELLO] Sending HELLO" in raw:
+            self._on_trickle_hello(raw, ts)
+        elif b"[Trickle] SUPPRESS" in raw:
+            self._on_trickle_suppress(raw, ts)
+        elif b"[Trickle] DOUBLE" in raw:
+            self._on_trickle_double(raw, ts)
+        elif b"[Trickle] RESET" in raw or b"[TRICKLE] Topology change" in raw:
+            self._on_trickle_reset(raw, ts)
+        elif b"[TOPOLOGY]" in raw:
+            self._on_topology(raw, ts)
+        elif b"Creating Routing Packet" in raw and b"[TrickleHELLO]" not in raw:
+            # This would be LoRaMesher's HELLO (should NOT happen with Trickle)
+            self._on_loramesh_hello(raw, ts)
+        elif b"[COST]" in raw and b"Route to" in raw:
+            self._on_cost(raw, ts)
+
+        # PM sensor data tracking
+        if b"[PMS]" in raw and self.PM_UNIT in raw:
+            self._on_pm(raw, ts)
+
+        # GPS data tracking
+        if b"[GPS]" in raw and (self.DEG_N in raw or b"sats" in raw):
+            self._on_gps(raw, ts)
+
+    def _on_tx(self, raw, ts):
+        self.counts[self.TX] += 1
+        self._emit(ts, "TX detected")
+        self._check_packet_pm(raw, ts)
+
+    def _on_rx(self, raw, ts):
+        self.counts[self.RX] += 1
+        self._emit(ts, "RX detected")
+        self._check_packet_pm(raw, ts)
+
+    def _check_packet_pm(self, raw, ts):
+        """PM data in transmission (enhanced packets)"""
+        if b"PM:" in raw and self.PM_UNIT in raw:
+            if b"PM: 1.0=" in raw or b"PM1.0" in raw:
+                self._emit(ts, "📦 PM in packet: {}", raw)
+
+    def _on_trickle_hello(self, raw, ts):
+        self.counts[self.TRICKLE_HELLO] += 1
+        self._emit(ts, f"📡 TRICKLE HELLO #{self.counts[self.TRICKLE_HELLO]}")
+
+    def _on_trickle_suppress(self, raw, ts):
+        self.counts[self.TRICKLE_SUPPRESS] += 1
+        self._emit(ts, "🔇 SUPPRESSED")
+
+    def _on_trickle_double(self, raw, ts):
+        self.counts[self.TRICKLE_DOUBLE] += 1
+        # Interval is only printed when the line carries one
+        m = self.INTERVAL_PATTERN.search(raw)
+        if m:
+            self._emit(ts, "⏫ INTERVAL DOUBLED to {}s", m.group(1))
+
+    def _on_trickle_reset(self, raw, ts):
+        self.counts[self.TRICKLE_RESET] += 1
+        self._emit(ts, "🔄 TRICKLE RESET")
+
+    def _on_topology(self, raw, ts):
+        self.counts[self.TOPOLOGY_CHANGES] += 1
+        self._emit(ts, "🌐 TOPOLOGY CHANGE")
+
+    def _on_loramesh_hello(self, raw, ts):
+        self.counts[self.LORAMESH_HELLO] += 1
+        self._emit(ts, "⚠️  LORAMESH HELLO (unexpected!)")
+
+    def _on_cost(self, raw, ts):
+        self.counts[self.COST_EVALS] += 1
+
+    def _on_pm(self, raw, ts):
+        self.counts[self.PM_READINGS] += 1
+        m = self.PM_VALUE_PATTERN.search(raw)
+        if m:
+            self._emit(ts, "💨 PM Data: {}", m.group(1))
+
+    def _on_gps(self, raw, ts):
+        self.counts[self.GPS_READINGS] += 1
+        # Extract coordinates if present
+        if self.DEG_N in raw and self.DEG_E in raw:
+            m = self.GPS_COORD_PATTERN.search(raw)
+            if m:
+                self._emit(ts, "📍 GPS: {}", m.group(1))
+            else:
+                self._emit(ts, "📍 GPS Update")
 
     def stop(self):
         """Stop capture"""
         self.running = False
-        if self.thread:
-            self.thread.join(timeout=2)
+        if self._log_file:
+            # A trailing line without its newline is still logged and counted
+            if self._rx_buf.strip():
+                try:
+                    self.process_chunk(b'\n')
+                except Exception as e:
+                    print(f"[Node {self.node_id}] Read error: {e}")
+            self._write_log()
+            self._log_file.close()
+            self._log_file = None
         if self.serial_conn:
             self.serial_conn.close()
-        print(f"[Node {self.node_id}] Stopped. Lines: {self.line_count}, TX: {self.tx_count}, RX: {self.rx_count}")
-        print(f"  Trickle HELLOs: {self.trickle_hello_count}, Suppressed: {self.trickle_suppress_count}")
-        print(f"  Interval doubles: {self.trickle_double_count}, Resets: {self.trickle_reset_count}")
-        print(f"  Sensor Data - PM: {self.pm_readings}, GPS: {self.gps_readings}")
+        print(f"[Node {self.node_id}] Stopped. Lines: {self.counts[self.LINES]}, TX: {self.counts[self.TX]}, RX: {self.counts[self.RX]}")
+        print(f"  Trickle HELLOs: {self.counts[self.TRICKLE_HELLO]}, Suppressed: {self.counts[self.TRICKLE_SUPPRESS]}")
+        print(f"  Interval doubles: {self.counts[self.TRICKLE_DOUBLE]}, Resets: {self.counts[self.TRICKLE_RESET]}")
+        print(f"  Sensor Data - PM: {self.counts[self.PM_READINGS]}, GPS: {self.counts[self.GPS_READINGS]}")
 
     def get_stats(self):
         """Get capture statistics"""
-        return {
-            'node_id': self.node_id,
-            'lines': self.line_count,
-            'tx': self.tx_count,
-            'rx': self.rx_count,
-            'trickle_hello': self.trickle_hello_count,
-            'trickle_suppress': self.trickle_suppress_count,
-            'trickle_double': self.trickle_double_count,
-            'trickle_reset': self.trickle_reset_count,
-            'loramesh_hello': self.loramesh_hello_count,
-            'topology_changes': self.topology_changes,
-            'cost_evals': self.cost_evaluations,
-            'pm_readings': self.pm_readings,
-            'gps_readings': self.gps_readings
-        }
+        return {'node_id': self.node_id, **dict(zip(self.COUNTERS, self.counts.tolist()))}
 
 class MultiNodeCapture:
     def __init__(self, node_configs, duration=None):
@@ -190,7 +324,8 @@ class MultiNodeCapture:
                 node_id=config['id'],
                 port=config['port'],
                 baudrate=config['baudrate'],
-                output_file=config['output']
+                output_file=config['output'],
+                verbose=config.get('verbose', True)
             )
             if capture.start():
                 self.captures.append(capture)
@@ -209,15 +344,46 @@ class MultiNodeCapture:
         self.start_time = time.time()
         self.running = True
 
-        # Wait for duration or Ctrl+C
+        # One selector serves every node until the duration runs out or Ctrl+C
+        selector = selectors.DefaultSelector()
+        for capture in self.captures:
+            selector.register(capture.fileno(), selectors.EVENT_READ, data=capture)
+
+        deadline = self.start_time + self.duration if self.duration else None
         try:
-            if self.duration:
-                time.sleep(self.duration)
+            while self.running:
+                timeout = 0.5
+                if deadline is not None:
+                    timeout = min(timeout, deadline - time.time())
+                    if timeout <= 0:
+                        break
+
+                for key, _ in selector.select(timeout=timeout):
+                    capture = key.data
+                    try:
+                        n = capture.read_available()
+                    except OSError as e:
+                        n = 0
+                        print(f"[Node {capture.node_id}] Read error: {e}")
+                    except Exception as e:
+                        # A bad line must not stop the other nodes; keep polling this one
+                        n = None
+                        print(f"[Node {capture.node_id}] Read error: {e}")
+                    if n == 0:
+                        # Port went away; stop polling it
+                        selector.unregister(key.fd)
+
+                # Quiet ports still get their buffered lines onto disk
+                for capture in self.captures:
+                    if capture.running:
+                        capture.flush_if_due()
             else:
-                while self.running:
-                    time.sleep(0.1)
+                # Loop ended by the SIGINT handler rather than the duration
+                print("\n\nStopping capture...")
         except KeyboardInterrupt:
             print("\n\nStopping capture...")
+        finally:
+            selector.close()
 
         return True
 
@@ -241,39 +407,33 @@ class MultiNodeCapture:
         print(f"Nodes captured: {len(self.captures)}")
         print()
 
-        total_tx = 0
-        total_rx = 0
-        total_trickle_hello = 0
-        total_trickle_suppress = 0
-        total_loramesh_hello = 0
-
-        for capture in self.captures:
-            stats = capture.get_stats()
-            print(f"Node {stats['node_id']}:")
-            print(f"  - Lines captured: {stats['lines']}")
-            print(f"  - TX events: {stats['tx']}")
-            print(f"  - RX events: {stats['rx']}")
-            print(f"  - Trickle HELLOs: {stats['trickle_hello']}")
-            print(f"  - Trickle Suppressed: {stats['trickle_suppress']}")
-            print(f"  - Interval Doubles: {stats['trickle_double']}")
-            print(f"  - Trickle Resets: {stats['trickle_reset']}")
-            print(f"  - LoRaMesh HELLOs: {stats['loramesh_hello']} (should be 0!)")
-            print(f"  - Topology Changes: {stats['topology_changes']}")
-            print(f"  - Cost Evaluations: {stats['cost_evals']}")
+        # One row of counters per node; totals are a column sum
+        C = NodeCapture
+        counts = np.array([capture.counts for capture in self.captures],
+                          dtype=np.int64).reshape(-1, len(C.COUNTERS))
+        totals = counts.sum(axis=0)
+
+        for capture, row in zip(self.captures, counts):
+            print(f"Node {capture.node_id}:")
+            print(f"  - Lines captured: {row[C.LINES]}")
+            print(f"  - TX events: {row[C.TX]}")
+            print(f"  - RX events: {row[C.RX]}")
+            print(f"  - Trickle HELLOs: {row[C.TRICKLE_HELLO]}")
+            print(f"  - Trickle Suppressed: {row[C.TRICKLE_SUPPRESS]}")
+            print(f"  - Interval Doubles: {row[C.TRICKLE_DOUBLE]}")
+            print(f"  - Trickle Resets: {row[C.TRICKLE_RESET]}")
+            print(f"  - LoRaMesh HELLOs: {row[C.LORAMESH_HELLO]} (should be 0!)")
+            print(f"  - Topology Changes: {row[C.TOPOLOGY_CHANGES]}")
+            print(f"  - Cost Evaluations: {row[C.COST_EVALS]}")
             print(f"  - Output: {capture.output_file}")
             print()
 
-            total_tx += stats['tx']
-            total_rx += stats['rx']
-            total_trickle_hello += stats['trickle_hello']
-            total_trickle_suppress += stats['trickle_suppress']
-            total_loramesh_hello += stats['loramesh_hello']
-
-        print(f"Total TX events: {total_tx}")
-        print(f"Total RX events: {total_rx}")
+        total_trickle_hello = totals[C.TRICKLE_HELLO]
+        print(f"Total TX events: {totals[C.TX]}")
+        print(f"Total RX events: {totals[C.RX]}")
         print(f"Total Trickle HELLOs: {total_trickle_hello}")
-        print(f"Total Suppressed: {total_trickle_suppress}")
-        print(f"Total LoRaMesh HELLOs: {total_loramesh_hello} (⚠️ should be 0!)")
+        print(f"Total Suppressed: {totals[C.TRICKLE_SUPPRESS]}")
+        print(f"Total LoRaMesh HELLOs: {totals[C.LORAMESH_HELLO]} (⚠️ should be 0!)")
 
         # Calculate reduction vs Protocol 2 baseline (30 HELLOs/hour fixed 120s)
         if elapsed > 0:
@@ -314,6 +474,8 @@ def main():
                        help='Node 3 serial port')
     parser.add_argument('-b', '--baud', type=int, default=115200,
                        help='Baud rate (default: 115200)')
+    parser.add_argument('-q', '--quiet', action='store_true',
+                       help='Do not print per-event lines (counts and logs are unaffected)')
 
     args = parser.parse_args()
 
@@ -337,29 +499,32 @@ def main():
             'id': 1,
             'port': args.node1_port,
             'baudrate': args.baud,
-            'output': output_dir / f"node1_{timestamp}.log"
+            'output': output_dir / f"node1_{timestamp}.log",
+            'verbose': not args.quiet
         },
         {
             'id': 2,
             'port': args.node2_port,
             'baudrate': args.baud,
-            'output': output_dir / f"node2_{timestamp}.log"
+            'output': output_dir / f"node2_{timestamp}.log",
+            'verbose': not args.quiet
         },
         {
             'id': 3,
             'port': args.node3_port,
             'baudrate': args.baud,
-            'output': output_dir / f"node3_{timestamp}.log"
+            'output': output_dir / f"node3_{timestamp}.log",
+            'verbose': not args.quiet
         }
     ]
 
     # Create and run capture
     capture = MultiNodeCapture(node_configs, duration=args.duration)
 
-    # Setup signal handler for clean shutdown
+    # Setup signal handler for clean shutdown: only end the reactor loop here,
+    # stop() runs once below after start() returns
     def signal_handler(sig, frame):
-        capture.stop()
-        sys.exit(0)
+        capture.running = False
 
     signal.signal(signal.SIGINT, signal_handler)
 
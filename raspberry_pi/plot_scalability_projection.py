@@ -4,8 +4,11 @@ Generate scalability projection chart for large deployments
 Shows: Measured data (3-5 nodes) + Mathematical projection (10-50 nodes)
 """
 
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import numpy as np
+from PIL import Image
 
 # Publication quality
 plt.rcParams['figure.dpi'] = 300
@@ -38,33 +41,18 @@ def plot_scalability_projection():
     # Model: N × 15 × (1 - efficiency)
     # Efficiency increases with N: 10-node=67%, 20-node=80%, 50-node=90%
     # Assumes I_max=600s can be reached (no safety ceiling)
-    efficiency_no_safety = {
-        10: 0.67,
-        20: 0.80,
-        50: 0.90
-    }
-
-    p3_no_safety = np.array([
-        10 * 15 * (1 - efficiency_no_safety[10]),  # ~50 HELLOs/30min
-        20 * 15 * (1 - efficiency_no_safety[20]),  # ~60 HELLOs/30min
-        50 * 15 * (1 - efficiency_no_safety[50])   # ~75 HELLOs/30min
-    ])
+    efficiency_no_safety = np.array([0.67, 0.80, 0.90])  # aligned with projected_nodes
+    p3_no_safety = projected_nodes * 15 * (1 - efficiency_no_safety)  # ~[50, 60, 75] HELLOs/30min
 
     # Protocol 3 WITH safety HELLO (180s ceiling, mobile/dynamic networks)
     # Safety ceiling limits I_max to 180s (instead of 600s)
     # More realistic for deployments requiring fast fault detection
     # Suppression still works but ceiling caps efficiency
-    efficiency_with_safety = {
-        10: 0.45,  # Conservative: better than measured 33% but limited by 180s ceiling
-        20: 0.55,  # Moderate improvement with more neighbors
-        50: 0.65   # Good suppression but ceiling prevents reaching 90%
-    }
-
-    p3_with_safety = np.array([
-        10 * 15 * (1 - efficiency_with_safety[10]),  # ~83 HELLOs/30min
-        20 * 15 * (1 - efficiency_with_safety[20]),  # ~135 HELLOs/30min
-        50 * 15 * (1 - efficiency_with_safety[50])   # ~263 HELLOs/30min
-    ])
+    # 10-node: conservative, better than measured 33% but limited by 180s ceiling
+    # 20-node: moderate improvement with more neighbors
+    # 50-node: good suppression but ceiling prevents reaching 90%
+    efficiency_with_safety = np.array([0.45, 0.55, 0.65])
+    p3_with_safety = projected_nodes * 15 * (1 - efficiency_with_safety)  # ~[83, 135, 263] HELLOs/30min
 
     # Combine measured + projected
     p2_all = np.concatenate([p2_measured, p2_projected])
@@ -76,6 +64,10 @@ def plot_scalability_projection():
     p3_no_safety_hourly = p3_no_safety_all * 2
     p3_with_safety_hourly = p3_with_safety_all * 2
 
+    # Reduction vs Protocol 2 at every node count
+    reduction_no_safety = (p2_hourly - p3_no_safety_hourly) / p2_hourly * 100
+    reduction_with_safety = (p2_hourly - p3_with_safety_hourly) / p2_hourly * 100
+
     # Plot measured data (solid lines)
     ax.plot(measured_nodes, p2_hourly[:3], 'o-', linewidth=3, markersize=10,
             color='#d62728', label='Protocol 2 (Measured)', zorder=3)
@@ -118,16 +110,13 @@ def plot_scalability_projection():
             bbox=dict(boxstyle='round', facecolor='lightgray', alpha=0.6))
 
     # 10-node annotations
-    reduction_10_no_safety = (p2_hourly[3] - p3_no_safety_hourly[3]) / p2_hourly[3] * 100
-    reduction_10_with_safety = (p2_hourly[3] - p3_with_safety_hourly[3]) / p2_hourly[3] * 100
-
-    ax.annotate(f'Stable network:\n{reduction_10_no_safety:.0f}% reduction\n(no safety ceiling)',
+    ax.annotate(f'Stable network:\n{reduction_no_safety[3]:.0f}% reduction\n(no safety ceiling)',
                 xy=(10, p3_no_safety_hourly[3]), xytext=(7, 130),
                 fontsize=9, ha='left',
                 bbox=dict(boxstyle='round', facecolor='lightgreen', alpha=0.7),
                 arrowprops=dict(arrowstyle='->', lw=1.5, color='darkgreen'))
 
-    ax.annotate(f'Mobile network:\n{reduction_10_with_safety:.0f}% reduction\n(180s safety)',
+    ax.annotate(f'Mobile network:\n{reduction_with_safety[3]:.0f}% reduction\n(180s safety)',
                 xy=(10, p3_with_safety_hourly[3]), xytext=(12, 220),
                 fontsize=9, ha='left',
                 bbox=dict(boxstyle='round', facecolor='#ffe5cc', alpha=0.7),
@@ -159,8 +148,10 @@ def plot_scalability_projection():
     plt.tight_layout()
     output_png = 'proposal_docs/images/figure5_1_scalability_projection.png'
     output_jpg = 'final_report/figures/figure5_1_scalability_projection.jpg'
-    plt.savefig(output_png, dpi=300, bbox_inches='tight')
-    plt.savefig(output_jpg, dpi=300, bbox_inches='tight', format='jpg')
+    plt.savefig(output_png, bbox_inches='tight')
+    # Re-encode the rendered PNG rather than drawing the figure a second time
+    with Image.open(output_png) as img:
+        img.convert('RGB').save(output_jpg, format='JPEG', dpi=(300, 300))
     print(f"✅ Scalability projection plot saved: {output_png}")
     print(f"✅ Scalability projection plot saved: {output_jpg}")
     plt.close()
@@ -169,22 +160,18 @@ def plot_scalability_projection():
     print("\n=== PROJECTION DATA ===")
     print("\n📊 10-node network:")
     print(f"  P2: {p2_hourly[3]:.0f} HELLOs/hr")
-    print(f"  P3 (no safety):   {p3_no_safety_hourly[3]:.0f} HELLOs/hr → {reduction_10_no_safety:.0f}% reduction (stable networks)")
-    print(f"  P3 (with safety): {p3_with_safety_hourly[3]:.0f} HELLOs/hr → {reduction_10_with_safety:.0f}% reduction (mobile networks)")
+    print(f"  P3 (no safety):   {p3_no_safety_hourly[3]:.0f} HELLOs/hr → {reduction_no_safety[3]:.0f}% reduction (stable networks)")
+    print(f"  P3 (with safety): {p3_with_safety_hourly[3]:.0f} HELLOs/hr → {reduction_with_safety[3]:.0f}% reduction (mobile networks)")
 
-    reduction_20_no_safety = (p2_hourly[4] - p3_no_safety_hourly[4]) / p2_hourly[4] * 100
-    reduction_20_with_safety = (p2_hourly[4] - p3_with_safety_hourly[4]) / p2_hourly[4] * 100
     print(f"\n📊 20-node network:")
     print(f"  P2: {p2_hourly[4]:.0f} HELLOs/hr")
-    print(f"  P3 (no safety):   {p3_no_safety_hourly[4]:.0f} HELLOs/hr → {reduction_20_no_safety:.0f}% reduction")
-    print(f"  P3 (with safety): {p3_with_safety_hourly[4]:.0f} HELLOs/hr → {reduction_20_with_safety:.0f}% reduction")
+    print(f"  P3 (no safety):   {p3_no_safety_hourly[4]:.0f} HELLOs/hr → {reduction_no_safety[4]:.0f}% reduction")
+    print(f"  P3 (with safety): {p3_with_safety_hourly[4]:.0f} HELLOs/hr → {reduction_with_safety[4]:.0f}% reduction")
 
-    reduction_50_no_safety = (p2_hourly[5] - p3_no_safety_hourly[5]) / p2_hourly[5] * 100
-    reduction_50_with_safety = (p2_hourly[5] - p3_with_safety_hourly[5]) / p2_hourly[5] * 100
     print(f"\n📊 50-node network:")
     print(f"  P2: {p2_hourly[5]:.0f} HELLOs/hr (EXCEEDS duty cycle limit!)")
-    print(f"  P3 (no safety):   {p3_no_safety_hourly[5]:.0f} HELLOs/hr → {reduction_50_no_safety:.0f}% reduction")
-    print(f"  P3 (with safety): {p3_with_safety_hourly[5]:.0f} HELLOs/hr → {reduction_50_with_safety:.0f}% reduction")
+    print(f"  P3 (no safety):   {p3_no_safety_hourly[5]:.0f} HELLOs/hr → {reduction_no_safety[5]:.0f}% reduction")
+    print(f"  P3 (with safety): {p3_with_safety_hourly[5]:.0f} HELLOs/hr → {reduction_with_safety[5]:.0f}% reduction")
 
     print(f"\n🔴 Duty cycle limit: 640 HELLOs/hr")
     print(f"\n📈 Protocol 2 violates duty cycle at ~21 nodes")
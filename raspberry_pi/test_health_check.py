@@ -4,9 +4,11 @@ Test Health Check - Detects Abnormal Network Behavior
 Analyzes test logs to identify issues like excessive resets, route timeouts, etc.
 """
 
+import os
 import sys
 from pathlib import Path
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
 class TestHealthAnalyzer:
     def __init__(self, log_files):
@@ -17,43 +19,16 @@ class TestHealthAnalyzer:
 
     def analyze(self):
         """Run all health checks"""
-        for log_file in self.log_files:
-            self._analyze_file(log_file)
+        # Logs are scanned independently, so count them across worker processes
+        workers = max(1, min(os.cpu_count() or 1, len(self.log_files)))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for log_file, counts in zip(self.log_files, executor.map(_count_events, self.log_files)):
+                self._analyze_file(log_file, counts)
 
         return self._print_report()
 
-    def _analyze_file(self, log_file):
-        """Analyze single log file"""
-        with open(log_file, 'r') as f:
-            lines = f.readlines()
-
-        # Count events
-        counts = {
-            'trickle_resets': 0,
-            'topology_changes': 0,
-            'route_timeouts': 0,
-            'trickle_hellos': 0,
-            'suppressions': 0,
-            'gap_detections': 0,
-            'safety_hellos': 0
-        }
-
-        for line in lines:
-            if "[Trickle] RESET" in line or "[TRICKLE] Topology change" in line:
-                counts['trickle_resets'] += 1
-            if "[TOPOLOGY]" in line and "size changed" in line:
-                counts['topology_changes'] += 1
-            if "Route timeout" in line:
-                counts['route_timeouts'] += 1
-            if "[TrickleHELLO] Sending HELLO" in line:
-                counts['trickle_hellos'] += 1
-            if "[Trickle] SUPPRESS" in line:
-                counts['suppressions'] += 1
-            if "GAP DETECTED" in line:
-                counts['gap_detections'] += 1
-            if "SAFETY HELLO" in line:
-                counts['safety_hellos'] += 1
-
+    def _analyze_file(self, log_file, counts):
+        """Check one log file's event counts"""
         node_name = log_file.stem
 
         # Check for abnormalities
@@ -98,6 +73,40 @@ class TestHealthAnalyzer:
         print("="*60)
         return 0 if not self.issues else 1
 
+def _count_events(log_file):
+    """Count health-related events in a single log file (process pool worker)"""
+    with open(log_file, 'r') as f:
+        lines = f.readlines()
+
+    # Count events
+    counts = {
+        'trickle_resets': 0,
+        'topology_changes': 0,
+        'route_timeouts': 0,
+        'trickle_hellos': 0,
+        'suppressions': 0,
+        'gap_detections': 0,
+        'safety_hellos': 0
+    }
+
+    for line in lines:
+        if "[Trickle] RESET" in line or "[TRICKLE] Topology change" in line:
+            counts['trickle_resets'] += 1
+        if "[TOPOLOGY]" in line and "size changed" in line:
+            counts['topology_changes'] += 1
+        if "Route timeout" in line:
+            counts['route_timeouts'] += 1
+        if "[TrickleHELLO] Sending HELLO" in line:
+            counts['trickle_hellos'] += 1
+        if "[Trickle] SUPPRESS" in line:
+            counts['suppressions'] += 1
+        if "GAP DETECTED" in line:
+            counts['gap_detections'] += 1
+        if "SAFETY HELLO" in line:
+            counts['safety_hellos'] += 1
+
+    return counts
+
 def main():
     if len(sys.argv) < 2:
         print("Usage: python3 test_health_check.py <test_folder>")